@@ -9,8 +9,9 @@
 # License: [MIT License]
 # Description: Automatically switches OBS scenes based on the active monitor
 #              (where the mouse pointer is) under KDE Plasma Wayland.
-#              Uses KWin D-Bus via qdbus6 to get the active monitor.
-#              Requires qt6-tools (for qdbus6).
+#              Uses KWin D-Bus (in-process via jeepney, or qdbus6 as a
+#              fallback) to get the active monitor.
+#              Requires jeepney or qt6-tools (for qdbus6).
 #              Attempts to use PyQt6 for monitor listing, falls back to kscreen.
 # =============================================================================
 
@@ -20,24 +21,72 @@ import json
 import time
 import os
 import re
+import sys
+import queue
+import threading
 import shutil # For shutil.which
 
+# Optional: jeepney provides an in-process D-Bus client (no fork/exec per poll)
+try:
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import DBusErrorResponse, unwrap_msg
+    JEEPNEY_AVAILABLE = True
+except ImportError:
+    JEEPNEY_AVAILABLE = False
+
 # --- Global Script Variables ---
 script_settings = None       # Stores OBS data settings object
-monitor_scene_map = {}       # Dictionary: {output_name: scene_name}
+monitor_scene_map = {}       # Dictionary: {output_name: scene_name} (output names interned)
+scene_source_cache = {}      # Dictionary: {output_name: obs_source_t} (strong refs)
+scene_cache_lock = threading.Lock() # Guards scene_source_cache between the UI and poll threads
+mapped_outputs = frozenset() # Output names that have a scene mapped
 detected_outputs = []        # List of detected monitor output names
-obs_scenes = []              # List of OBS scene names
+_prev_outputs = ()           # Output names whose combos are currently in the mapping group
+obs_scenes = ()              # Tuple of OBS scene names
 is_active = False            # Whether the switching logic is currently active
 activate_on_startup = False  # Whether to activate automatically when OBS starts
 last_active_output = None    # Last detected active output name
+consecutive_unchanged = 0    # Polls in a row that reported the same output
+_consecutive_failures = 0    # D-Bus calls in a row that timed out or failed
+_failure_backoff_s = 0.0     # Current back-off after repeated failures (doubles per trip)
+_failure_backoff_until = 0.0 # time.monotonic() until which D-Bus calls are skipped
 prop_group_mapping = None    # Reference to the UI property group for mappings
-polling_timer = None         # Reference to the OBS timer object
+polling_timer = None         # Reference to the OBS timer object (fallback)
+polling_thread = None        # Background thread driven by a timerfd
+polling_timerfd = None       # File descriptor of the periodic timerfd
+polling_stop = None          # threading.Event telling the poll thread to exit
+polling_fd_lock = None       # Lock ordering stop requests against the poll thread closing its fd
+query_thread = None          # Worker thread issuing the (blocking) D-Bus query
+query_stop = None            # threading.Event telling the query worker to exit
+query_requested = threading.Event() # Set by poll_kwin to ask for a fresh query
+output_mailbox = queue.Queue(maxsize=1) # One-slot mailbox: (monotonic_time, output_name)
+dbus_connection = None       # Persistent jeepney D-Bus session connection
+active_output_msg = None     # Cached activeOutputName method call message
+_outputs_cache = None        # (time.monotonic(), outputs) from the last successful detection
 
 # --- Constants ---
 POLL_INTERVAL_MS = 350       # Polling interval in milliseconds
 QDBUS6_PATH = "/usr/bin/qdbus6" # Default qdbus6 path
 KSCREEN_DOCTOR_PATH = "/usr/bin/kscreen-doctor" # Default kscreen-doctor path
 QDBUS6_OK = False            # Flag indicating if qdbus6 check was successful
+_DEPS_CHECKED = False        # Whether initialize_dependencies already ran
+_QDBUS_CMD = None            # qdbus6 activeOutputName command, built once the path is known
+DBUS_CALL_TIMEOUT_S = 0.15   # Hard timeout for the active-output D-Bus call (seconds)
+STALE_RESULT_S = 2 * POLL_INTERVAL_MS / 1000 # Mailbox results older than this are dropped
+POLL_BACKOFF_THRESHOLD = 10  # Unchanged polls before querying only every other tick
+FAILURE_BACKOFF_THRESHOLD = 3 # Consecutive D-Bus timeouts/errors before backing off
+FAILURE_BACKOFF_BASE_S = 5.0 # First back-off after repeated failures (seconds)
+FAILURE_BACKOFF_MAX_S = 60.0 # Upper bound for the exponential back-off (seconds)
+# Minimal environment for qdbus6: it only needs to find the session bus
+_MIN_ENV = {key: value for key, value in (
+    ('PATH', '/usr/bin:/bin'),
+    ('DBUS_SESSION_BUS_ADDRESS', os.environ.get('DBUS_SESSION_BUS_ADDRESS', '')),
+    ('XDG_RUNTIME_DIR', os.environ.get('XDG_RUNTIME_DIR', '')),
+) if value}
+OUTPUTS_CACHE_TTL_S = 5.0    # Detected monitor names are reused for this long (seconds)
+_OUTPUT_RE = re.compile(r'^Output:\s+\S+\s+([\w-]+)', re.MULTILINE) # kscreen-doctor -o: "Output: <id> <name> ..."
+_NAME_RE = re.compile(r'\A[\w-]+\Z').match # Valid output names (usable in property ids)
 
 # --- Dependency Check Functions ---
 def check_command(command_name, default_path):
@@ -57,38 +106,173 @@ def check_command(command_name, default_path):
 
 # --- D-Bus/KWin Interaction ---
 def initialize_dependencies():
-    """Checks for qdbus6 existence on first run."""
-    global QDBUS6_PATH, QDBUS6_OK
-    if hasattr(initialize_dependencies, "already_checked"): return
-    initialize_dependencies.already_checked = True
+    """Opens the jeepney D-Bus connection and checks for qdbus6 on first run."""
+    global QDBUS6_PATH, QDBUS6_OK, _QDBUS_CMD, _DEPS_CHECKED
+    if _DEPS_CHECKED: return
+    _DEPS_CHECKED = True
 
     found_path = check_command('qdbus6', QDBUS6_PATH)
     if found_path:
         QDBUS6_PATH = found_path
         QDBUS6_OK = True
+        _QDBUS_CMD = (QDBUS6_PATH, 'org.kde.KWin', '/KWin', 'org.kde.KWin.activeOutputName')
         print(f"OBSDirector: qdbus6 check OK ({QDBUS6_PATH})")
     else:
         QDBUS6_OK = False
 
+    open_dbus_session()
+
+def open_dbus_session():
+    """Opens the persistent D-Bus session connection if jeepney is available."""
+    global dbus_connection, active_output_msg
+    if not JEEPNEY_AVAILABLE:
+        print("OBSDirector: jeepney not available. Using qdbus6 subprocess fallback.")
+        return
+    try:
+        dbus_connection = open_dbus_connection(bus='SESSION')
+        addr = DBusAddress('/KWin', bus_name='org.kde.KWin', interface='org.kde.KWin')
+        active_output_msg = new_method_call(addr, 'activeOutputName')
+        print("OBSDirector: D-Bus session connection OK (jeepney)")
+    except Exception as e:
+        print(f"OBSDirector: Could not open D-Bus session via jeepney: {e}." + (" Using qdbus6 fallback." if QDBUS6_OK else ""))
+        dbus_connection = None
+        active_output_msg = None
+
+def drop_dbus_connection():
+    """Closes a broken query connection; later calls use qdbus6 if available."""
+    global dbus_connection
+    connection, dbus_connection = dbus_connection, None
+    if connection is not None:
+        try: connection.close()
+        except Exception: pass
+
+def close_dbus_session():
+    """Closes the persistent D-Bus session connection, if open."""
+    global dbus_connection, active_output_msg
+    if dbus_connection is not None:
+        try: dbus_connection.close()
+        except Exception as e: print(f"OBSDirector: Error closing D-Bus connection: {e}")
+        finally: dbus_connection = None; active_output_msg = None
+
 def get_kwin_active_output_name_subprocess() -> str | None:
-    """Calls KWin D-Bus method org.kde.KWin.activeOutputName via qdbus6."""
+    """Calls KWin D-Bus method org.kde.KWin.activeOutputName.
+
+    Uses the persistent jeepney connection when available, otherwise qdbus6.
+    Returns None without calling D-Bus while backing off after repeated failures.
+    """
+    if time.monotonic() < _failure_backoff_until: return None
+    if dbus_connection is not None:
+        try:
+            reply = unwrap_msg(dbus_connection.send_and_get_reply(active_output_msg, timeout=DBUS_CALL_TIMEOUT_S))
+            record_dbus_success()
+            value = reply[0] if reply else None
+            return sys.intern(value) if value else None
+        except TimeoutError:
+            record_dbus_failure()
+            return None
+        except DBusErrorResponse:
+            # KWin answered with an error (e.g. ServiceUnknown while restarting), like a non-zero qdbus6 exit
+            record_dbus_failure()
+            return None
+        except OSError as e: # Includes ConnectionError: the socket is gone
+            # Not reopened here: this runs on the query worker, and a reconnect could outlive its stop/join
+            print(f"OBSDirector: D-Bus session connection lost: {e}." +
+                  (" Using qdbus6 fallback." if QDBUS6_OK else " Script will not function until reloaded."))
+            drop_dbus_connection()
+            record_dbus_failure()
+            return None
+        except Exception as e:
+            print(f"OBSDirector: Exception calling D-Bus activeOutputName: {e}")
+            return None
+
     if not QDBUS6_OK: return None
     try:
-        cmd = [QDBUS6_PATH, 'org.kde.KWin', '/KWin', 'org.kde.KWin.activeOutputName']
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=0.4)
+        # Binary stdout, no inherited environment and no fd-closing pass keep the fork/exec cheap
+        result = subprocess.run(_QDBUS_CMD, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=_MIN_ENV,
+                                close_fds=False, check=False, timeout=DBUS_CALL_TIMEOUT_S)
         if result.returncode == 0:
-            value = result.stdout.strip()
-            return value if value else None
-        else: return None
+            record_dbus_success()
+            # Output names are ASCII connector names (e.g. b"DP-1\n"): trim as bytes, decode once
+            value = result.stdout.rstrip(b'\n').decode('ascii', 'ignore')
+            return sys.intern(value) if value else None
+        else:
+            record_dbus_failure()
+            return None
     except subprocess.TimeoutExpired:
         # print("OBSDirector: Timeout calling qdbus6 for activeOutputName") # Reduce log noise
+        record_dbus_failure()
         return None
     except Exception as e:
         print(f"OBSDirector: Exception calling qdbus6 for activeOutputName: {e}")
         return None
 
+def record_dbus_success():
+    """Resets the failure counters after a D-Bus call that succeeded."""
+    global _consecutive_failures, _failure_backoff_s
+    _consecutive_failures = 0
+    _failure_backoff_s = 0.0
+
+def record_dbus_failure():
+    """Counts a timed-out or failed D-Bus call and backs off once KWin keeps failing."""
+    global _consecutive_failures, _failure_backoff_s, _failure_backoff_until
+    _consecutive_failures += 1
+    if _consecutive_failures < FAILURE_BACKOFF_THRESHOLD: return
+    _consecutive_failures = 0
+    _failure_backoff_s = min(_failure_backoff_s * 2 or FAILURE_BACKOFF_BASE_S, FAILURE_BACKOFF_MAX_S)
+    _failure_backoff_until = time.monotonic() + _failure_backoff_s
+    print(f"OBSDirector: KWin D-Bus call timed out or failed {FAILURE_BACKOFF_THRESHOLD} times in a row. Pausing queries for {_failure_backoff_s:.0f}s.")
+
+def start_query_worker():
+    """Starts the worker thread that performs the active-output query."""
+    global query_thread, query_stop
+    if query_thread is not None: return
+    query_stop = threading.Event()
+    query_thread = threading.Thread(target=query_worker_loop, args=(query_stop,),
+                                    name="OBSDirectorQuery", daemon=True)
+    query_thread.start()
+
+def stop_query_worker():
+    """Stops the query worker thread and discards any pending result."""
+    global query_thread, query_stop
+    if query_thread is not None:
+        query_stop.set()
+        query_requested.set() # Wake the worker so it sees the stop flag
+        query_thread.join(timeout=1.0)
+        query_thread = None; query_stop = None
+    query_requested.clear()
+    try: output_mailbox.get_nowait()
+    except queue.Empty: pass
+
+def query_worker_loop(stop_event):
+    """Worker body: runs one D-Bus query per request and posts it to the mailbox.
+
+    Keeps the blocking call (up to DBUS_CALL_TIMEOUT_S) off the polling thread,
+    so a stalled KWin delays results instead of stalling poll_kwin.
+    """
+    while not stop_event.is_set():
+        if not query_requested.wait(timeout=1.0): continue
+        query_requested.clear()
+        if stop_event.is_set(): return
+        name = get_kwin_active_output_name_subprocess()
+        # Single producer: drop the unread (stale) result, then post the new one
+        try: output_mailbox.get_nowait()
+        except queue.Empty: pass
+        output_mailbox.put_nowait((time.monotonic(), name))
+
 # --- Monitor Detection ---
-def detect_outputs():
+def detect_outputs(force=False):
+    """Returns monitor output names, reusing a recent detection unless forced."""
+    global _outputs_cache
+    cached = _outputs_cache
+    if not force and cached is not None and time.monotonic() - cached[0] < OUTPUTS_CACHE_TTL_S:
+        return list(cached[1])
+    outputs = scan_outputs()
+    # Only cache real detections (same test as the mapping UI), so a failure is retried on the next call
+    failed = not outputs or "Error" in outputs[0] or "Unknown" in outputs[0]
+    _outputs_cache = None if failed else (time.monotonic(), tuple(outputs))
+    return outputs
+
+def scan_outputs():
     """Detects monitor output names. Tries PyQt6 first, then kscreen-doctor."""
     outputs = []
     print("OBSDirector: Detecting monitors...")
@@ -102,7 +286,7 @@ def detect_outputs():
             # print(f"OBSDirector: Detected {len(screens)} monitors via PyQt6 QScreen.")
             for screen in screens:
                 name = screen.name()
-                if name: outputs.append(name)
+                if name: outputs.append(sys.intern(name))
             if outputs:
                 print(f"OBSDirector: Monitor names via PyQt6: {outputs}")
                 return outputs
@@ -121,12 +305,7 @@ def detect_outputs():
         cmd_ks = [KSCREEN_DOCTOR_PATH, '-o']
         result_ks = subprocess.run(cmd_ks, capture_output=True, text=True, check=False, timeout=3)
         if result_ks.returncode == 0 and result_ks.stdout:
-            lines = result_ks.stdout.strip().split('\n')
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 2 and parts[0] == "Output:":
-                    output_name = parts[1].strip().replace(':','')
-                    if output_name and output_name not in ["enabled", "disabled"]: outputs.append(output_name)
+            outputs = [sys.intern(m.group(1)) for m in _OUTPUT_RE.finditer(result_ks.stdout)]
             print(f"OBSDirector: Monitor names via kscreen-doctor: {outputs}")
         else: outputs = ["Error_kscreen_failed"]
     except Exception as e: print(f"OBSDirector: Exception running kscreen-doctor: {e}"); outputs = ["Error_kscreen_exception"]
@@ -145,7 +324,7 @@ def script_description():
             "Automatically switches OBS scene based on the active monitor<br>"
             "detected via KWin D-Bus (mouse pointer location).<br>"
             "Configure monitor-to-scene mapping below.<br>"
-            "Requires Plasma 6 Wayland and qt6-tools (for qdbus6).<br>"
+            "Requires Plasma 6 Wayland and jeepney or qt6-tools (for qdbus6).<br>"
             "PyQt6 recommended for best monitor detection.")
 
 def script_defaults(settings):
@@ -153,8 +332,9 @@ def script_defaults(settings):
     print("OBSDirector: Setting defaults...")
     obs.obs_data_set_default_bool(settings, "script_enabled", False)
     obs.obs_data_set_default_bool(settings, "activate_on_startup", False) # Default is OFF
-    default_mapping = """{\n    "DP-1": "Scene",\n    "HDMI-A-0": "Scene 2"\n}"""
-    obs.obs_data_set_default_string(settings, "monitor_mapping", default_mapping) # Store mapping as JSON string
+    # Mapping is stored flat, one "map_<output>" string per monitor
+    obs.obs_data_set_default_string(settings, "map_DP-1", "Scene")
+    obs.obs_data_set_default_string(settings, "map_HDMI-A-0", "Scene 2")
 
 def script_properties():
     """Creates the user interface for the script in OBS settings."""
@@ -180,26 +360,26 @@ def script_properties():
     obs.obs_properties_add_group(props, "monitor_mapping_group", "Monitor -> Scene Mapping", obs.OBS_GROUP_NORMAL, prop_group_mapping)
 
     # --- Dependency Warning ---
-    if not QDBUS6_OK:
-         obs.obs_properties_add_text(props, "qdbus_warning", "WARNING: 'qdbus6' not found or not executable. Script will not function.", obs.OBS_TEXT_WARNING)
+    if not QDBUS6_OK and dbus_connection is None:
+         obs.obs_properties_add_text(props, "qdbus_warning", "WARNING: No D-Bus access (jeepney connection or 'qdbus6'). Script will not function.", obs.OBS_TEXT_WARNING)
 
     return props
 
 def script_load(settings):
     """Called when the script is loaded."""
     print("OBSDirector: Script Loaded.")
-    global script_settings, monitor_scene_map, is_active, activate_on_startup
+    global script_settings, monitor_scene_map, mapped_outputs, is_active, activate_on_startup
     script_settings = settings
     initialize_dependencies() # Ensure check runs
 
     # Load saved mapping
-    map_json = obs.obs_data_get_string(settings, "monitor_mapping")
-    try:
-        monitor_scene_map = json.loads(map_json)
-        print(f"OBSDirector: Mapping loaded: {monitor_scene_map}")
-    except json.JSONDecodeError:
-        print("OBSDirector: Could not load saved mapping.")
-        monitor_scene_map = {}
+    migrate_json_mapping(settings)
+    monitor_scene_map = load_mapping(settings)
+    print(f"OBSDirector: Mapping loaded: {monitor_scene_map}")
+    mapped_outputs = frozenset(monitor_scene_map)
+    # Scenes usually don't exist yet while scripts load: fill the cache once they do
+    obs.obs_frontend_add_event_callback(on_frontend_event)
+    rebuild_scene_source_cache()
 
     # Load activation states
     is_active = obs.obs_data_get_bool(settings, "script_enabled")
@@ -222,20 +402,20 @@ def script_unload():
     """Called when the script is unloaded."""
     print("OBSDirector: Script Unloaded.")
     stop_polling_timer() # Ensure timer is stopped and removed
+    close_dbus_session()
+    obs.obs_frontend_remove_event_callback(on_frontend_event)
+    release_scene_source_cache()
 
 def script_save(settings):
     """Called before settings are saved (e.g., on OBS close)."""
-    # Save the current mapping state
-    try:
-        map_json = json.dumps(monitor_scene_map)
-        obs.obs_data_set_string(settings, "monitor_mapping", map_json)
-    except Exception as e:
-        print(f"OBSDirector: Error saving mapping on save: {e}")
+    # Save the current mapping state (the combos normally keep these keys in sync already)
+    for output_name, scene_name in monitor_scene_map.items():
+        obs.obs_data_set_string(settings, f"map_{output_name}", scene_name)
 
 def script_update(settings):
     """Called when script settings change in the UI."""
     print("OBSDirector: Settings updated...")
-    global is_active, script_settings, activate_on_startup, last_active_output
+    global is_active, script_settings, activate_on_startup, last_active_output, consecutive_unchanged
     script_settings = settings
 
     new_active_state = obs.obs_data_get_bool(settings, "script_enabled")
@@ -252,12 +432,34 @@ def script_update(settings):
         else:
             stop_polling_timer()
             last_active_output = None # Reset last detected output when disabled
+            consecutive_unchanged = 0
 
 
 # --- Timer and Scene Switching Logic ---
 def start_polling_timer():
-    """Creates and starts the OBS timer if not already running."""
-    global polling_timer
+    """Starts polling, preferring a timerfd-driven thread over the OBS timer."""
+    global polling_timer, polling_thread, polling_timerfd, polling_stop, polling_fd_lock
+    start_query_worker()
+    if polling_thread is not None: return
+    if polling_timer is None and hasattr(os, "timerfd_create"):
+        # CLOCK_MONOTONIC timerfd: fixed cadence, and each read reports missed ticks
+        try:
+            interval = POLL_INTERVAL_MS / 1000
+            polling_timerfd = os.timerfd_create(time.CLOCK_MONOTONIC)
+            os.timerfd_settime(polling_timerfd, initial=interval, interval=interval)
+            polling_stop = threading.Event()
+            polling_fd_lock = threading.Lock()
+            polling_thread = threading.Thread(target=timerfd_poll_loop,
+                                              args=(polling_timerfd, polling_stop, polling_fd_lock),
+                                              name="OBSDirectorPoll", daemon=True)
+            polling_thread.start()
+            print(f"OBSDirector: Starting timerfd polling thread (Interval: {POLL_INTERVAL_MS}ms).")
+            return
+        except Exception as e:
+            print(f"OBSDirector: ERROR creating timerfd poll thread: {e}. Falling back to OBS timer.")
+            if polling_timerfd is not None:
+                os.close(polling_timerfd)
+            polling_thread = None; polling_timerfd = None; polling_stop = None; polling_fd_lock = None
     if polling_timer is None:
         print(f"OBSDirector: Starting polling timer (Interval: {POLL_INTERVAL_MS}ms).")
         try:
@@ -270,56 +472,148 @@ def start_polling_timer():
              print(f"OBSDirector: ERROR creating timer: {e}. Polling disabled.")
 
 def stop_polling_timer():
-    """Stops and removes the OBS timer if running."""
-    global polling_timer
+    """Stops the timerfd poll thread or removes the OBS timer if running."""
+    global polling_timer, polling_thread, polling_timerfd, polling_stop, polling_fd_lock
+    if polling_thread is not None:
+        print("OBSDirector: Stopping timerfd polling thread.")
+        # No join: a switch in progress waits on this (UI) thread. Closing the fd does not
+        # interrupt a blocked read(), so fire the timer now; the thread closes the fd on exit.
+        with polling_fd_lock:
+            polling_stop.set()
+            try: os.timerfd_settime(polling_timerfd, initial=1e-9)
+            except Exception as e: print(f"OBSDirector: ERROR stopping poll thread: {e}")
+        polling_thread = None; polling_timerfd = None; polling_stop = None; polling_fd_lock = None
     if polling_timer is not None:
         print("OBSDirector: Stopping polling timer.")
         try: obs.timer_remove(polling_timer)
         except AttributeError: print("OBSDirector: ERROR - obs.timer_remove function not found.")
         except Exception as e: print(f"OBSDirector: ERROR removing timer: {e}")
         finally: polling_timer = None
+    stop_query_worker()
 
-def poll_kwin():
-    """Function called periodically by the timer."""
-    global last_active_output
+def timerfd_poll_loop(tfd, stop_event, fd_lock):
+    """Poll thread body: waits on the timerfd and runs poll_kwin once per wake-up.
 
-    # The timer handles the interval, this function executes the check
-    current_output = get_kwin_active_output_name_subprocess()
+    A read consumes every expiration since the last one, so ticks missed while
+    a poll ran long are coalesced into a single catch-up poll.
+    obs_queue_task cannot take a Python callback, so poll_kwin runs here;
+    obs_frontend_set_current_scene marshals the switch to the UI thread itself.
+    The thread owns tfd and closes it once stop_event is set.
+    """
+    try:
+        while not stop_event.is_set():
+            os.read(tfd, 8)
+            if stop_event.is_set(): return
+            try: poll_kwin()
+            except Exception as e: print(f"OBSDirector: Exception in poll thread: {e}")
+    except OSError as e: print(f"OBSDirector: Poll thread stopped: {e}")
+    finally:
+        with fd_lock: os.close(tfd)
 
-    if current_output is not None and current_output != last_active_output:
+def poll_kwin():
+    """Function called periodically by the poll thread (or OBS timer)."""
+    global last_active_output, consecutive_unchanged
+
+    # Nothing can be switched: don't even query D-Bus
+    if not mapped_outputs or not is_active: return
+
+    # Never blocks: take the latest query result (if any) and request the next one.
+    # Once the output has been steady on a mapped monitor, only request after an
+    # empty tick, so queries alternate with reads and run every other tick.
+    try: result_time, current_output = output_mailbox.get_nowait()
+    except queue.Empty: result_time, current_output = None, None
+    backing_off = consecutive_unchanged >= POLL_BACKOFF_THRESHOLD and last_active_output in mapped_outputs
+    if result_time is None or not backing_off: query_requested.set()
+    if result_time is None or time.monotonic() - result_time > STALE_RESULT_S: return
+
+    # Names are interned, so the steady state is a pointer compare; == only runs on a change
+    if current_output is last_active_output or current_output == last_active_output:
+        consecutive_unchanged += 1
+        return
+    consecutive_unchanged = 0
+
+    if current_output is not None:
         print(f"OBSDirector: Active monitor changed -> '{current_output}'")
         last_active_output = current_output
 
         scene_to_set = monitor_scene_map.get(current_output)
         if scene_to_set:
             print(f"OBSDirector: Switching to scene '{scene_to_set}' for monitor '{current_output}'")
-            scene_source = obs.obs_get_source_by_name(scene_to_set)
+            scene_source = acquire_scene_source(current_output, scene_to_set)
             if scene_source:
                 try: obs.obs_frontend_set_current_scene(scene_source)
                 finally: obs.obs_source_release(scene_source) # IMPORTANT: Release source reference
             else: print(f"OBSDirector: Error - Source not found for scene '{scene_to_set}' (check exact name)")
         # else: print(f"OBSDirector: No scene mapped for '{current_output}'") # Reduce log noise
 
+def acquire_scene_source(output_name, scene_name):
+    """Returns a new reference to the scene mapped to output_name (caller releases).
+
+    Served from scene_source_cache; on a miss the scene is looked up by name
+    once and stored, so later switches skip the lookup.
+    """
+    with scene_cache_lock:
+        cached = scene_source_cache.get(output_name)
+        if cached is not None and not obs.obs_source_removed(cached):
+            return obs.obs_source_get_ref(cached)
+    scene_source = obs.obs_get_source_by_name(scene_name)
+    if not scene_source: return None
+    stale = None
+    with scene_cache_lock:
+        if scene_source_cache.get(output_name) is cached: # Not replaced meanwhile: keep this lookup
+            stale = cached
+            scene_source_cache[output_name] = scene_source
+            scene_source = obs.obs_source_get_ref(scene_source)
+    if stale is not None: obs.obs_source_release(stale)
+    return scene_source
+
+def rebuild_scene_source_cache():
+    """Resolves every mapped scene to a source reference once, replacing the cache."""
+    global scene_source_cache
+    new_cache = {}
+    for output_name, scene_name in monitor_scene_map.items():
+        scene_source = obs.obs_get_source_by_name(scene_name)
+        if scene_source: new_cache[output_name] = scene_source
+    with scene_cache_lock:
+        old_cache, scene_source_cache = scene_source_cache, new_cache
+    # Safe outside the lock: poll_kwin holds its own reference while switching
+    for scene_source in old_cache.values(): obs.obs_source_release(scene_source)
+
+def release_scene_source_cache():
+    """Releases all cached scene source references."""
+    global scene_source_cache
+    with scene_cache_lock:
+        old_cache, scene_source_cache = scene_source_cache, {}
+    for scene_source in old_cache.values(): obs.obs_source_release(scene_source)
+
+def on_frontend_event(event):
+    """Rebuilds the scene cache once scenes exist or the scene collection changes."""
+    if event in (obs.OBS_FRONTEND_EVENT_FINISHED_LOADING, obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED):
+        rebuild_scene_source_cache()
+
 # --- UI Callbacks and Helper Functions ---
 def get_obs_scene_names():
     """Gets a sorted list of scene names from OBS."""
     scenes = []; sources = obs.obs_frontend_get_scenes()
     if sources:
-        try:
-            for scene in sources: name = obs.obs_source_get_name(scene); scenes.append(name)
+        _get_name = obs.obs_source_get_name # Local binding: no module attribute lookup per scene
+        try: scenes = [sys.intern(_get_name(scene)) for scene in sources]
         finally: obs.source_list_release(sources) # Release the list
     # print(f"OBSDirector: Found OBS scenes: {scenes}") # Reduce noise
     return sorted(scenes)
 
-def update_mapping_properties_ui(props_group):
+def update_mapping_properties_ui(props_group, force_detect=False):
     """Populates the Monitor -> Scene mapping UI group."""
-    global detected_outputs, obs_scenes, monitor_scene_map, script_settings
+    global detected_outputs, obs_scenes, monitor_scene_map, script_settings, _prev_outputs
     print("OBSDirector: Updating mapping UI...")
-    detected_outputs = detect_outputs()
-    obs_scenes = get_obs_scene_names()
+    detected_outputs = detect_outputs(force=force_detect)
+    obs_scenes = tuple(get_obs_scene_names())
 
-    # TODO: Implement proper clearing of the props_group if possible/needed
-    # Currently, refreshing might add duplicate entries if monitor list changes.
+    # Clear what the previous call added, so refreshing never duplicates entries
+    for output_name in _prev_outputs:
+        obs.obs_properties_remove_by_name(props_group, f"map_{output_name}")
+    obs.obs_properties_remove_by_name(props_group, "error_detect_text")
+    _prev_outputs = ()
 
     if not detected_outputs or "Error" in detected_outputs[0] or "Unknown" in detected_outputs[0]:
          obs.obs_properties_add_text(props_group, "error_detect_text",
@@ -328,8 +622,10 @@ def update_mapping_properties_ui(props_group):
          return
 
     print(f"OBSDirector: Creating mapping UI for monitors: {detected_outputs}")
+    added_outputs = []
     for output_name in detected_outputs:
-        if not output_name or not re.match(r'^[\w-]+$', output_name): continue
+        if not _NAME_RE(output_name) or output_name in added_outputs: continue
+        added_outputs.append(output_name)
         combo_id = f"map_{output_name}"
         combo = obs.obs_properties_add_list(props_group, combo_id, f"{output_name}:",
                                             obs.OBS_COMBO_TYPE_LIST, obs.OBS_COMBO_FORMAT_STRING)
@@ -343,32 +639,63 @@ def update_mapping_properties_ui(props_group):
              current_scene = monitor_scene_map.get(output_name, "") # Default to "" if not mapped
              obs.obs_data_set_string(script_settings, combo_id, current_scene)
 
+    _prev_outputs = tuple(added_outputs)
+    rebuild_scene_source_cache()
+
 def mapping_property_changed(props, prop, settings):
     """Callback when a mapping ComboBox value changes."""
-    global monitor_scene_map
+    global monitor_scene_map, mapped_outputs
     prop_id = obs.obs_property_name(prop) # Use correct API function
     if not prop_id or not prop_id.startswith("map_"): return True
-    monitor_name = prop_id[len("map_"):]
+    monitor_name = sys.intern(prop_id[len("map_"):])
     selected_scene = obs.obs_data_get_string(settings, prop_id)
     print(f"OBSDirector: UI Mapping Changed - '{monitor_name}' -> '{selected_scene}'")
+    previous_scene = monitor_scene_map.get(monitor_name, "")
     if not selected_scene: # "<Do Nothing>" selected
         if monitor_name in monitor_scene_map: del monitor_scene_map[monitor_name]
     else: monitor_scene_map[monitor_name] = selected_scene
-    # Save immediately when changed? Or rely on script_save? Let's save here for persistence.
-    try:
-        map_json = json.dumps(monitor_scene_map)
-        if script_settings: obs.obs_data_set_string(script_settings, "monitor_mapping", map_json)
-    except Exception as e: print(f"OBSDirector: Error saving mapping in callback: {e}")
+    mapped_outputs = frozenset(monitor_scene_map)
+    # The combo value is already stored in settings under prop_id; nothing to serialize
+    if selected_scene != previous_scene: rebuild_scene_source_cache()
     return True # IMPORTANT: Return True
 
+def load_mapping(settings):
+    """Builds {output_name: scene_name} from the flat "map_<output>" settings keys.
+
+    obs_data_item_next takes an obs_data_item_t** that obspython cannot pass,
+    so the key names (saved values and defaults) are listed via obs_data_get_json.
+    """
+    keys = set()
+    defaults = obs.obs_data_get_defaults(settings)
+    try:
+        for data in (settings, defaults):
+            try: keys.update(json.loads(obs.obs_data_get_json(data) or "{}"))
+            except json.JSONDecodeError: print("OBSDirector: Could not list saved settings keys.")
+    finally: obs.obs_data_release(defaults)
+    mapping = {}
+    for key in keys:
+        if not key.startswith("map_"): continue
+        scene_name = obs.obs_data_get_string(settings, key)
+        if scene_name: mapping[sys.intern(key[len("map_"):])] = scene_name
+    return mapping
+
+def migrate_json_mapping(settings):
+    """Converts a mapping saved by older versions as a JSON string into flat keys."""
+    if not obs.obs_data_has_user_value(settings, "monitor_mapping"): return
+    try:
+        for output_name, scene_name in json.loads(obs.obs_data_get_string(settings, "monitor_mapping")).items():
+            key = f"map_{output_name}"
+            if not obs.obs_data_has_user_value(settings, key): obs.obs_data_set_string(settings, key, scene_name)
+        print("OBSDirector: Migrated JSON monitor mapping to per-monitor settings.")
+    except (json.JSONDecodeError, AttributeError): print("OBSDirector: Could not migrate saved JSON mapping.")
+    obs.obs_data_erase(settings, "monitor_mapping")
+
 def refresh_pressed(props, prop):
     """Callback for the Refresh button."""
     print("OBSDirector: Refresh button pressed.")
     if prop_group_mapping:
         print("OBSDirector: Refreshing mapping UI...")
-        # WARNING: Without proper clearing, this may add duplicate UI elements
-        # if the monitor list changes between refreshes.
-        update_mapping_properties_ui(prop_group_mapping)
-        print("OBSDirector: Mapping UI refreshed (visual duplicates possible).")
+        update_mapping_properties_ui(prop_group_mapping, force_detect=True) # Explicit refresh: rescan monitors
+        print("OBSDirector: Mapping UI refreshed.")
     else: print("OBSDirector: Mapping property group reference not found.")
     return True # Return True is safer
\ No newline at end of file